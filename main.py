@@ -7,26 +7,107 @@ Main entry point for the application
 import os
 import sys
 import argparse
+import importlib
+import threading
+from functools import wraps
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent
+_ENV = _ROOT / '.env'
 
 # Add src directory to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, str(_ROOT / 'src'))
+
+# Modules each command depends on, checked by setup_environment()
+_TEXT_MODULES = ('emotion_detection.text_emotion', 'music_analysis.spotify_client', 'recommendation.recommender')
+_IMAGE_MODULES = ('emotion_detection.face_emotion', 'music_analysis.spotify_client', 'recommendation.recommender')
+_ALL_MODULES = ('emotion_detection.face_emotion',) + _TEXT_MODULES
+
+def _shared(factory):
+    """Run factory() once per process, safe to call from preload threads
+    
+    A failure is remembered as well, so a failed preload is reported by
+    the first foreground call instead of being retried from scratch.
+    """
+    lock = threading.Lock()
+    outcome = []
+    
+    @wraps(factory)
+    def wrapper():
+        with lock:
+            if not outcome:
+                try:
+                    outcome.append((factory(), None))
+                except Exception as e:
+                    outcome.append((None, e))
+            result, error = outcome[0]
+        
+        if error is not None:
+            raise error
+        return result
+    
+    # True once factory() has finished, whether it succeeded or failed
+    wrapper.is_done = lambda: bool(outcome)
+    return wrapper
 
-def setup_environment():
-    """Setup environment and check dependencies"""
+def _preload(factory):
+    """Run a factory in the background, errors surface when it is next used"""
+    try:
+        factory()
+    except Exception:
+        pass
+
+@_shared
+def _text_detector():
+    """Shared text emotion detector"""
+    from emotion_detection.text_emotion import TextEmotionDetector
+    return TextEmotionDetector()
+
+@_shared
+def _face_detector():
+    """Shared face emotion detector"""
+    from emotion_detection.face_emotion import FaceEmotionDetector
+    return FaceEmotionDetector()
+
+@_shared
+def _spotify_client():
+    """Shared Spotify client"""
+    from music_analysis.spotify_client import SpotifyClient
+    return SpotifyClient()
+
+@_shared
+def _recommender():
+    """Shared recommender with its track database and model loaded"""
+    from recommendation.recommender import EmotionBasedRecommender
+    recommender = EmotionBasedRecommender(_spotify_client())
+    recommender.build_track_database(use_cached=True)
+    recommender.load_model()
+    return recommender
+
+def setup_environment(modules=_ALL_MODULES, preload=()):
+    """Setup environment and check dependencies
+    
+    Only the given modules are imported, so commands don't pay for
+    libraries they never use. Factories listed in preload are started on
+    daemon threads so their models are loaded by the time they are first
+    used, without keeping the process alive when they are never needed.
+    """
     try:
         # Check if .env file exists
-        env_file = os.path.join(os.path.dirname(__file__), '.env')
-        if not os.path.exists(env_file):
+        if not _ENV.is_file():
             print("❌ .env file not found. Please create one with your Spotify credentials.")
             return False
         
         # Import required modules
-        from emotion_detection.face_emotion import FaceEmotionDetector
-        from emotion_detection.text_emotion import TextEmotionDetector
-        from music_analysis.spotify_client import SpotifyClient
-        from recommendation.recommender import EmotionBasedRecommender
+        for module in modules:
+            importlib.import_module(module)
+        
+        if modules:
+            print("✅ All modules imported successfully")
+        
+        for factory in preload:
+            threading.Thread(target=_preload, args=(factory,), daemon=True).start()
         
-        print("✅ All modules imported successfully")
         return True
         
     except ImportError as e:
@@ -42,9 +123,7 @@ def test_text_emotion(text):
     print(f"\n📝 Analyzing text: '{text}'")
     
     try:
-        from emotion_detection.text_emotion import TextEmotionDetector
-        
-        detector = TextEmotionDetector()
+        detector = _text_detector()
         result, error = detector.detect_emotion_from_text(text)
         
         if error:
@@ -67,9 +146,7 @@ def test_face_emotion(image_path):
     print(f"\n📷 Analyzing image: {image_path}")
     
     try:
-        from emotion_detection.face_emotion import FaceEmotionDetector
-        
-        detector = FaceEmotionDetector()
+        detector = _face_detector()
         result, error = detector.detect_emotion_from_image(image_path)
         
         if error:
@@ -92,17 +169,10 @@ def test_music_recommendations(emotion_result, num_recommendations=10):
     print(f"\n🎵 Getting music recommendations...")
     
     try:
-        from music_analysis.spotify_client import SpotifyClient
-        from recommendation.recommender import EmotionBasedRecommender
-        
-        spotify_client = SpotifyClient()
-        recommender = EmotionBasedRecommender(spotify_client)
-        
-        print("📚 Building track database...")
-        recommender.build_track_database(use_cached=True)
-        
-        print("🤖 Loading recommendation model...")
-        recommender.load_model()
+        if not _recommender.is_done():
+            print("📚 Building track database...")
+            print("🤖 Loading recommendation model...")
+        recommender = _recommender()
         
         # Get recommendations
         music_features = emotion_result['music_features']
@@ -112,21 +182,23 @@ def test_music_recommendations(emotion_result, num_recommendations=10):
             print("❌ No recommendations found")
             return
         
-        print(f"✅ Found {len(recommendations)} recommendations:")
-        print("=" * 60)
+        # Build the whole listing first and write it out in one go
+        lines = [f"✅ Found {len(recommendations)} recommendations:", "=" * 60]
         
         for i, track in enumerate(recommendations[:10], 1):
-            print(f"{i:2d}. {track['name']}")
-            print(f"    🎤 Artist: {track['artist']}")
+            lines.append(f"{i:2d}. {track['name']}")
+            lines.append(f"    🎤 Artist: {track['artist']}")
             if track.get('album'):
-                print(f"    💿 Album: {track['album']}")
+                lines.append(f"    💿 Album: {track['album']}")
             if track.get('popularity'):
-                print(f"    📈 Popularity: {track['popularity']}%")
+                lines.append(f"    📈 Popularity: {track['popularity']}%")
             if track.get('similarity_score'):
-                print(f"    💖 Match: {track['similarity_score']:.1%}")
+                lines.append(f"    💖 Match: {track['similarity_score']:.1%}")
             if track.get('external_url'):
-                print(f"    🔗 Spotify: {track['external_url']}")
-            print()
+                lines.append(f"    🔗 Spotify: {track['external_url']}")
+            lines.append("")
+        
+        sys.stdout.write("\n".join(lines) + "\n")
         
     except Exception as e:
         print(f"❌ Error getting recommendations: {e}")
@@ -146,7 +218,7 @@ def main():
     """Main function"""
     parser = argparse.ArgumentParser(description='Spotify Music Recommender Based on Human Emotion')
     parser.add_argument('--text', type=str, help='Analyze emotion from text')
-    parser.add_argument('--image', type=str, help='Analyze emotion from image file')
+    parser.add_argument('--image', type=str, nargs='+', help='Analyze emotion from one or more image files')
     parser.add_argument('--web', action='store_true', help='Run web application')
     parser.add_argument('--setup', action='store_true', help='Setup and test environment')
     
@@ -156,7 +228,29 @@ def main():
     print("🎵 SPOTIFY MUSIC RECOMMENDER BASED ON HUMAN EMOTION 🎵")
     print("=" * 60)
     
-    if not setup_environment():
+    # Check inputs up front so nothing is preloaded for work that won't run
+    image_paths = []
+    for image_path in args.image or ():
+        if os.path.exists(image_path):
+            image_paths.append(image_path)
+        else:
+            print(f"❌ Image file not found: {image_path}")
+    
+    # Pick what to import and preload for the command that will actually run;
+    # the web app imports its own components and reports its own errors
+    if args.setup:
+        modules, preload = _ALL_MODULES, ()
+    elif args.web or not (args.text or args.image):
+        modules, preload = (), ()
+    elif args.text:
+        modules = _TEXT_MODULES
+        preload = (_text_detector, _recommender) if args.text.strip() else ()
+    elif image_paths:
+        modules, preload = _IMAGE_MODULES, (_face_detector, _recommender)
+    else:
+        return
+    
+    if not setup_environment(modules, preload):
         return
     
     if args.setup:
@@ -174,13 +268,11 @@ def main():
         return
     
     if args.image:
-        if not os.path.exists(args.image):
-            print(f"❌ Image file not found: {args.image}")
-            return
-        
-        result = test_face_emotion(args.image)
-        if result:
-            test_music_recommendations(result)
+        # All images share one cached detector, so the model loads only once
+        for image_path in image_paths:
+            result = test_face_emotion(image_path)
+            if result:
+                test_music_recommendations(result)
         return
     
     # Default: run web app
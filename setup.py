@@ -8,6 +8,7 @@ import os
 import sys
 import subprocess
 import platform
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def print_header():
@@ -68,8 +69,10 @@ def install_requirements():
         return False
     
     try:
-        pip_cmd = [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"]
-        subprocess.run(pip_cmd, check=True)
+        # Prefer prebuilt wheels and skip pip's interactive/self-update checks
+        pip_env = {**os.environ, "PIP_DISABLE_PIP_VERSION_CHECK": "1", "PIP_NO_INPUT": "1"}
+        pip_cmd = [sys.executable, "-m", "pip", "install", "--prefer-binary", "-r", "requirements.txt"]
+        subprocess.run(pip_cmd, env=pip_env, check=True)
         print("✅ All packages installed successfully")
         return True
         
@@ -129,6 +132,14 @@ FLASK_DEBUG=True
         print(f"❌ Failed to create .env file: {e}")
         return False
 
+def _try_import(module):
+    """Import a module, returning the ImportError instead of raising it"""
+    try:
+        __import__(module)
+        return None
+    except ImportError as e:
+        return e
+
 def test_imports():
     """Test if all required modules can be imported"""
     print("\n🧪 Testing module imports...")
@@ -145,11 +156,14 @@ def test_imports():
     
     failed_imports = []
     
-    for module, description in test_modules:
-        try:
-            __import__(module)
+    # Heavy imports are mostly file I/O and extension loading, so run them side by side
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        errors = list(executor.map(_try_import, [module for module, _ in test_modules]))
+    
+    for (module, description), error in zip(test_modules, errors):
+        if error is None:
             print(f"✅ {module} - {description}")
-        except ImportError:
+        else:
             print(f"❌ {module} - {description}")
             failed_imports.append(module)
     
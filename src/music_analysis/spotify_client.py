@@ -1,11 +1,44 @@
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Maximum number of track IDs accepted by one audio-features request
+AUDIO_FEATURES_BATCH_SIZE = 100
+
+# Upper bound on Spotify requests in flight at once, keeps us under rate limits
+MAX_CONCURRENT_REQUESTS = 10
+
+# Pooled keep-alive connections, sized for threaded web workers
+HTTP_POOL_SIZE = 64
+
+# Spotify metadata changes slowly, so lookups are kept for an hour
+CACHE_SIZE = 10_000
+CACHE_TTL = 3600
+
+# Shared by all clients; the lock covers cache access from worker threads
+_cache_lock = threading.Lock()
+_search_cache = TTLCache(CACHE_SIZE, CACHE_TTL)
+_track_cache = TTLCache(CACHE_SIZE, CACHE_TTL)
+_features_cache = TTLCache(CACHE_SIZE, CACHE_TTL)
+
+# Cached for tracks Spotify has no audio features for, so they aren't re-requested
+_NO_FEATURES = object()
+
+def _method_key(self, *args, **kwargs):
+    """Cache key for a client method, independent of the client instance"""
+    return hashkey(*args, **kwargs)
+
 class SpotifyClient:
     def __init__(self):
         """Initialize Spotify client with credentials"""
@@ -20,25 +53,71 @@ class SpotifyClient:
             client_secret=client_secret
         )
         
-        self.sp = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
+        self.sp = spotipy.Spotify(
+            client_credentials_manager=client_credentials_manager,
+            requests_session=self._build_session()
+        )
+    
+    @staticmethod
+    def _build_session():
+        """HTTP session that reuses connections and retries rate limits and server errors"""
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE'])
+        )
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount('https://', adapter)
+        return session
     
     def search_tracks(self, query, limit=50, offset=0):
         """Search for tracks on Spotify"""
         try:
-            results = self.sp.search(q=query, type='track', limit=limit, offset=offset)
-            return results['tracks']['items']
+            # A fresh list, but the track dicts are shared through the cache
+            return list(self._search(query, limit, offset))
         except Exception as e:
             print(f"Error searching tracks: {e}")
             return []
     
+    @cached(_search_cache, key=_method_key, lock=_cache_lock)
+    def _search(self, query, limit, offset):
+        """Cached track search, errors propagate and are not cached
+        
+        The tracks are shared through the cache and must only be read.
+        """
+        results = self.sp.search(q=query, type='track', limit=limit, offset=offset)
+        return results['tracks']['items']
+    
     def get_track_features(self, track_ids):
         """Get audio features for multiple tracks"""
         try:
             if isinstance(track_ids, str):
                 track_ids = [track_ids]
             
-            features = self.sp.audio_features(track_ids)
-            return [f for f in features if f is not None]
+            # Serve what we can from the cache and only ask Spotify for the rest
+            with _cache_lock:
+                features_by_id = {track_id: _features_cache.get(track_id) for track_id in track_ids}
+            
+            missing = [track_id for track_id, features in features_by_id.items() if features is None]
+            if missing:
+                fetched = self.sp.audio_features(missing)
+                with _cache_lock:
+                    for track_id, features in zip(missing, fetched):
+                        features = _NO_FEATURES if features is None else features
+                        _features_cache[track_id] = features
+                        features_by_id[track_id] = features
+            
+            # Copied, the cached dicts are shared by every caller and thread
+            track_features = []
+            for track_id in track_ids:
+                features = features_by_id[track_id]
+                if features is not None and features is not _NO_FEATURES:
+                    track_features.append(dict(features))
+            
+            return track_features
         except Exception as e:
             print(f"Error getting track features: {e}")
             return []
@@ -46,7 +125,7 @@ class SpotifyClient:
     def get_track_info(self, track_id):
         """Get basic track information"""
         try:
-            track = self.sp.track(track_id)
+            track = self._track(track_id)
             return {
                 'id': track['id'],
                 'name': track['name'],
@@ -60,6 +139,14 @@ class SpotifyClient:
             print(f"Error getting track info: {e}")
             return None
     
+    @cached(_track_cache, key=_method_key, lock=_cache_lock)
+    def _track(self, track_id):
+        """Cached track lookup, errors propagate and are not cached
+        
+        The result is shared through the cache and must only be read.
+        """
+        return self.sp.track(track_id)
+    
     def get_playlist_tracks(self, playlist_id):
         """Get tracks from a specific playlist"""
         try:
@@ -98,25 +185,47 @@ class SpotifyClient:
     def build_dataset(self, genres=['pop', 'rock', 'jazz', 'classical', 'electronic'], 
                      tracks_per_genre=100):
         """Build a dataset of tracks with features for training"""
+        def search_genre(genre):
+            return self.search_tracks(f'genre:{genre}', limit=tracks_per_genre)
+        
+        # Requests are I/O bound, so overlap them on a bounded pool
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+            tracks_by_genre = []
+            for genre, tracks in zip(genres, executor.map(search_genre, genres)):
+                print(f"Collected {len(tracks)} {genre} tracks")
+                tracks_by_genre.append(tracks)
+            
+            # Genres overlap, keep each track once under the first genre it was found in
+            unique_tracks = {}
+            for genre, tracks in zip(genres, tracks_by_genre):
+                for track in tracks:
+                    unique_tracks.setdefault(track['id'], (track, genre))
+            
+            # Get audio features in batches, the endpoint takes up to 100 IDs per call
+            track_ids = list(unique_tracks)
+            batches = [track_ids[i:i + AUDIO_FEATURES_BATCH_SIZE]
+                       for i in range(0, len(track_ids), AUDIO_FEATURES_BATCH_SIZE)]
+            
+            features_by_id = {}
+            for batch_features in executor.map(self.get_track_features, batches):
+                for features in batch_features:
+                    features_by_id[features['id']] = features
+        
         dataset = []
         
-        for genre in genres:
-            print(f"Collecting {genre} tracks...")
-            tracks = self.search_tracks(f'genre:{genre}', limit=tracks_per_genre)
+        for track_id, (track, genre) in unique_tracks.items():
+            features = features_by_id.get(track_id)
+            if not features:
+                continue
             
-            for track in tracks:
-                track_info = {
-                    'id': track['id'],
-                    'name': track['name'],
-                    'artist': track['artists'][0]['name'] if track['artists'] else 'Unknown',
-                    'popularity': track['popularity'],
-                    'genre': genre
-                }
-                
-                # Get audio features
-                features = self.get_track_features(track['id'])
-                if features:
-                    track_info.update(features[0])
-                    dataset.append(track_info)
+            track_info = {
+                'id': track_id,
+                'name': track['name'],
+                'artist': track['artists'][0]['name'] if track['artists'] else 'Unknown',
+                'popularity': track['popularity'],
+                'genre': genre
+            }
+            track_info.update(features)
+            dataset.append(track_info)
         
         return pd.DataFrame(dataset)
\ No newline at end of file
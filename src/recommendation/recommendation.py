@@ -1,11 +1,36 @@
 from textblob import TextBlob
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from functools import lru_cache
+import numpy as np
 import re
 
+# Column order of the emotion feature matrix
+MUSIC_FEATURES = ('valence', 'energy', 'danceability', 'tempo')
+
+# Number of distinct preprocessed texts whose sentiment results are kept
+SENTIMENT_CACHE_SIZE = 2048
+
+@lru_cache(maxsize=SENTIMENT_CACHE_SIZE)
+def _textblob_sentiment(text):
+    """TextBlob (polarity, subjectivity), cached per text"""
+    return TextBlob(text).sentiment
+
 class TextEmotionDetector:
+    # Special characters to strip, keeping basic punctuation
+    _CLEAN_RE = re.compile(r'[^\w\s.,!?]')
+    
+    # Runs of ! or ? beyond four, VADER's emphasis stops growing there
+    # (TextBlob's doesn't, so this is applied to VADER's input only)
+    _REPEAT_RE = re.compile(r'([!?])\1{4,}')
+    
+    # Upper edges of the VADER compound-score bins used by the sentiment fallback.
+    # The -0.1 and 0.5 edges are nudged down so those exact scores land in the bin above.
+    _COMPOUND_BINS = np.array([-0.7, -0.5, np.nextafter(-0.1, -1), 0.1, np.nextafter(0.5, -1)])
+    
     def __init__(self):
         """Initialize text emotion detector"""
         self.analyzer = SentimentIntensityAnalyzer()
+        self._vader_scores = lru_cache(maxsize=SENTIMENT_CACHE_SIZE)(self.analyzer.polarity_scores)
         
         # Emotion keywords mapping
         self.emotion_keywords = {
@@ -31,16 +56,44 @@ class TextEmotionDetector:
             'calm': {'valence': 0.5, 'energy': 0.3, 'danceability': 0.4, 'tempo': 85},
             'neutral': {'valence': 0.5, 'energy': 0.5, 'danceability': 0.5, 'tempo': 110}
         }
+        
+        # Same mapping as one row per emotion, for vectorized distance computations
+        self._emotion_names = list(self.emotion_mapping)
+        self._emotion_index = {emotion: i for i, emotion in enumerate(self._emotion_names)}
+        self._emotion_matrix = np.asarray(
+            [[features[name] for name in MUSIC_FEATURES] for features in self.emotion_mapping.values()],
+            dtype=np.float32
+        )
+        self._emotion_matrix.flags.writeable = False
+        
+        # Sentiment fallback as a lookup table indexed by [compound bin, neg > 0.5, pos > neu]
+        happy, sad, angry, neutral = (self._emotion_index[e] for e in ('happy', 'sad', 'angry', 'neutral'))
+        self._sentiment_lookup = np.array([
+            [[sad, sad], [angry, angry]],              # compound <= -0.7
+            [[sad, sad], [sad, sad]],                  # -0.7 < compound <= -0.5
+            [[sad, sad], [sad, sad]],                  # -0.5 < compound < -0.1
+            [[neutral, neutral], [neutral, neutral]],  # -0.1 <= compound <= 0.1
+            [[neutral, happy], [neutral, happy]],      # 0.1 < compound < 0.5
+            [[happy, happy], [happy, happy]]           # compound >= 0.5
+        ], dtype=np.int8)
+        
+        # All keywords in one precompiled whole-word pattern, so the text is scanned once
+        # and 'glove' no longer counts as 'love'; each keyword maps to its emotion's row
+        self._keyword_index = {
+            keyword: self._emotion_index[emotion]
+            for emotion, keywords in self.emotion_keywords.items()
+            for keyword in keywords
+        }
+        self._keyword_regex = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, sorted(self._keyword_index, key=len, reverse=True))) + r')\b'
+        )
+        
+        # Text without any of these characters cannot contain a keyword
+        self._keyword_first_chars = frozenset(keyword[0] for keyword in self._keyword_index)
     
     def preprocess_text(self, text):
         """Clean and preprocess text"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s.,!?]', '', text)
-        
-        return text.strip()
+        return self._CLEAN_RE.sub('', text.lower()).strip()
     
     def detect_emotion_from_text(self, text):
         """Detect emotion from text using multiple approaches"""
@@ -50,24 +103,24 @@ class TextEmotionDetector:
             
             text = self.preprocess_text(text)
             
-            # Method 1: VADER sentiment analysis
-            sentiment_scores = self.analyzer.polarity_scores(text)
+            # Method 1: VADER sentiment analysis (copied, the cached dict is shared).
+            # Long !/? runs are shortened for VADER only, which stops counting them
+            # past four; TextBlob counts every ! so it keeps the full text.
+            sentiment_scores = dict(self._vader_scores(self._REPEAT_RE.sub(r'\1\1\1\1', text)))
             
             # Method 2: TextBlob sentiment
-            blob = TextBlob(text)
-            textblob_polarity = blob.sentiment.polarity
-            textblob_subjectivity = blob.sentiment.subjectivity
+            textblob_polarity, textblob_subjectivity = _textblob_sentiment(text)
             
             # Method 3: Keyword-based emotion detection
-            keyword_emotions = self._detect_emotions_by_keywords(text)
+            keyword_scores, max_keyword_emotion, max_keyword_score = self._detect_emotions_by_keywords(text)
             
             # Combine methods to determine primary emotion
             primary_emotion = self._determine_primary_emotion(
-                sentiment_scores, textblob_polarity, keyword_emotions
+                sentiment_scores, textblob_polarity, max_keyword_emotion, max_keyword_score
             )
             
             # Calculate confidence score
-            confidence = self._calculate_confidence(sentiment_scores, keyword_emotions)
+            confidence = self._calculate_confidence(sentiment_scores, max_keyword_score)
             
             return {
                 'emotion': primary_emotion,
@@ -75,7 +128,10 @@ class TextEmotionDetector:
                 'sentiment_scores': sentiment_scores,
                 'textblob_polarity': textblob_polarity,
                 'textblob_subjectivity': textblob_subjectivity,
-                'keyword_emotions': keyword_emotions,
+                'keyword_emotions': {
+                    emotion: int(keyword_scores[self._emotion_index[emotion]])
+                    for emotion in self.emotion_keywords
+                },
                 'music_features': self.emotion_mapping.get(primary_emotion, self.emotion_mapping['neutral'])
             }, None
             
@@ -83,58 +139,43 @@ class TextEmotionDetector:
             return None, f"Error analyzing text emotion: {str(e)}"
     
     def _detect_emotions_by_keywords(self, text):
-        """Detect emotions based on keyword presence"""
-        emotion_scores = {}
+        """Detect emotions based on keyword presence
         
-        for emotion, keywords in self.emotion_keywords.items():
-            score = 0
-            for keyword in keywords:
-                # Count occurrences of keyword in text
-                count = text.count(keyword)
-                score += count
-            
-            emotion_scores[emotion] = score
+        Returns keyword counts aligned with self._emotion_names, plus the
+        emotion with the most keyword hits and its count.
+        """
+        if self._keyword_first_chars.isdisjoint(text):
+            emotion_scores = np.zeros(len(self._emotion_names), dtype=np.intp)
+        else:
+            matches = np.fromiter(
+                (self._keyword_index[keyword] for keyword in self._keyword_regex.findall(text)),
+                dtype=np.intp
+            )
+            emotion_scores = np.bincount(matches, minlength=len(self._emotion_names))
         
-        return emotion_scores
+        max_index = int(emotion_scores.argmax())
+        return emotion_scores, self._emotion_names[max_index], int(emotion_scores[max_index])
     
-    def _determine_primary_emotion(self, sentiment_scores, textblob_polarity, keyword_emotions):
+    def _determine_primary_emotion(self, sentiment_scores, textblob_polarity, max_keyword_emotion, max_keyword_score):
         """Determine primary emotion from different analysis methods"""
         
         # Check if keywords strongly indicate an emotion
-        max_keyword_emotion = max(keyword_emotions, key=keyword_emotions.get)
-        max_keyword_score = keyword_emotions[max_keyword_emotion]
-        
         if max_keyword_score > 0:
             return max_keyword_emotion
         
         # Fall back to sentiment analysis
-        compound = sentiment_scores['compound']
-        pos = sentiment_scores['pos']
-        neg = sentiment_scores['neg']
-        neu = sentiment_scores['neu']
+        compound_bin = int(np.searchsorted(self._COMPOUND_BINS, sentiment_scores['compound']))
+        negative = int(sentiment_scores['neg'] > 0.5)
+        positive = int(sentiment_scores['pos'] > sentiment_scores['neu'])
         
-        # Determine emotion based on sentiment scores
-        if compound >= 0.5:
-            return 'happy'
-        elif compound <= -0.5:
-            if neg > 0.5:
-                return 'angry' if sentiment_scores['compound'] <= -0.7 else 'sad'
-            else:
-                return 'sad'
-        elif compound > 0.1:
-            return 'happy' if pos > neu else 'neutral'
-        elif compound < -0.1:
-            return 'sad'
-        else:
-            return 'neutral'
+        return self._emotion_names[self._sentiment_lookup[compound_bin, negative, positive]]
     
-    def _calculate_confidence(self, sentiment_scores, keyword_emotions):
+    def _calculate_confidence(self, sentiment_scores, max_keyword_score):
         """Calculate confidence score for emotion detection"""
         # Base confidence on VADER compound score
         base_confidence = abs(sentiment_scores['compound'])
         
         # Boost confidence if keywords are present
-        max_keyword_score = max(keyword_emotions.values()) if keyword_emotions else 0
         keyword_boost = min(max_keyword_score * 0.1, 0.3)  # Max 30% boost
         
         confidence = min(base_confidence + keyword_boost, 1.0)
@@ -147,4 +188,9 @@ class TextEmotionDetector:
     
     def get_music_features_for_emotion(self, emotion):
         """Get music features for a specific emotion"""
-        return self.emotion_mapping.get(emotion.lower(), self.emotion_mapping['neutral'])
\ No newline at end of file
+        return self.emotion_mapping.get(emotion.lower(), self.emotion_mapping['neutral'])
+    
+    def get_music_features_vector(self, emotion):
+        """Get music features for a specific emotion as a read-only vector in MUSIC_FEATURES order"""
+        index = self._emotion_index.get(emotion.lower(), self._emotion_index['neutral'])
+        return self._emotion_matrix[index]
\ No newline at end of file
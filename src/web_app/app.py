@@ -1,14 +1,15 @@
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, send_from_directory
+import orjson
 import os
 import sys
 import json
 import base64
-from werkzeug.utils import secure_filename
+import threading
+from functools import wraps
 
 # Add parent directories to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from emotion_detection.face_emotion import FaceEmotionDetector
 from emotion_detection.text_emotion import TextEmotionDetector
 from music_analysis.spotify_client import SpotifyClient
 from recommendation.recommender import EmotionBasedRecommender
@@ -24,22 +25,80 @@ os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 # Initialize components
 try:
     spotify_client = SpotifyClient()
-    face_detector = FaceEmotionDetector()
     text_detector = TextEmotionDetector()
     recommender = EmotionBasedRecommender(spotify_client)
-    
-    # Build/load track database
-    recommender.build_track_database()
-    recommender.load_model()
-    
-    print("All components initialized successfully!")
 except Exception as e:
     print(f"Error initializing components: {e}")
     spotify_client = None
-    face_detector = None
     text_detector = None
     recommender = None
 
+def ojsonify(obj, status=200):
+    """JSON response serialized with orjson, which also handles numpy values"""
+    return Response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY), status=status, mimetype='application/json')
+
+# The face detector pulls in OpenCV/TensorFlow, so it is only created when first needed
+_face_detector = None
+_face_detector_lock = threading.Lock()
+
+def get_face_detector():
+    """Shared face detector, imported and created on first use"""
+    global _face_detector
+    with _face_detector_lock:
+        if _face_detector is None:
+            from emotion_detection.face_emotion import FaceEmotionDetector
+            _face_detector = FaceEmotionDetector()
+        return _face_detector
+
+# Guards the one-time background load started from the face detection page
+_face_warm_up_started = False
+_face_warm_up_lock = threading.Lock()
+
+def _load_face_detector():
+    """Background target for the face detector warm-up"""
+    try:
+        get_face_detector()
+    except Exception as e:
+        print(f"Error loading face detector: {e}")
+
+def warm_up_face_detector():
+    """Start loading the face detector in the background, at most once"""
+    global _face_warm_up_started
+    with _face_warm_up_lock:
+        if _face_warm_up_started:
+            return
+        _face_warm_up_started = True
+    
+    threading.Thread(target=_load_face_detector, daemon=True).start()
+
+# Set once the track database and model have been loaded (or failed to load)
+_ready = threading.Event()
+
+def _warm_up():
+    """Build/load the track database and model without blocking startup"""
+    global recommender
+    try:
+        if recommender is not None:
+            recommender.build_track_database()
+            recommender.load_model()
+            print("All components initialized successfully!")
+    except Exception as e:
+        print(f"Error initializing components: {e}")
+        recommender = None
+    finally:
+        _ready.set()
+
+threading.Thread(target=_warm_up, daemon=True).start()
+
+def requires_recommender(view):
+    """Answer 503 while the recommender is still warming up"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _ready.is_set():
+            return ojsonify({'error': 'Recommender is warming up, please try again shortly'}, 503)
+        return view(*args, **kwargs)
+    return wrapper
+
 @app.route('/')
 def index():
     """Main page"""
@@ -48,6 +107,9 @@ def index():
 @app.route('/face-detection')
 def face_detection():
     """Face emotion detection page"""
+    # Start loading the detector while the user picks an image
+    warm_up_face_detector()
+    
     return render_template('face_detection.html')
 
 @app.route('/text-analysis')
@@ -56,6 +118,7 @@ def text_analysis():
     return render_template('text_analysis.html')
 
 @app.route('/api/analyze-text', methods=['POST'])
+@requires_recommender
 def analyze_text_emotion():
     """API endpoint for text emotion analysis"""
     try:
@@ -63,13 +126,13 @@ def analyze_text_emotion():
         text = data.get('text', '')
         
         if not text.strip():
-            return jsonify({'error': 'No text provided'}), 400
+            return ojsonify({'error': 'No text provided'}, 400)
         
         # Analyze emotion
         emotion_result, error = text_detector.detect_emotion_from_text(text)
         
         if error:
-            return jsonify({'error': error}), 400
+            return ojsonify({'error': error}, 400)
         
         # Get recommendations
         recommendations = recommender.recommend_by_text_emotion(emotion_result, 15)
@@ -79,45 +142,42 @@ def analyze_text_emotion():
             'recommendations': recommendations
         }
         
-        return jsonify(response)
+        return ojsonify(response)
         
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
 
 @app.route('/api/analyze-image', methods=['POST'])
+@requires_recommender
 def analyze_image_emotion():
     """API endpoint for image emotion analysis"""
     try:
+        # Reject oversized uploads before reading the body
+        if request.content_length and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+            return ojsonify({'error': 'File too large'}, 413)
+        
         # Handle file upload
         if 'image' in request.files:
             file = request.files['image']
             if file.filename == '':
-                return jsonify({'error': 'No file selected'}), 400
-            
-            # Save uploaded file
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            # Analyze emotion
-            emotion_result, error = face_detector.detect_emotion_from_image(filepath)
+                return ojsonify({'error': 'No file selected'}, 400)
             
-            # Clean up uploaded file
-            try:
-                os.remove(filepath)
-            except:
-                pass
+            # Analyze emotion straight from memory, no temporary file. Sent as a
+            # data URL, the same shape the webcam capture posts
+            mimetype = file.mimetype or 'application/octet-stream'
+            image_data = f"data:{mimetype};base64,{base64.b64encode(file.read()).decode('ascii')}"
+            emotion_result, error = get_face_detector().detect_emotion_from_base64(image_data)
         
         # Handle base64 image data
         elif request.json and 'image_data' in request.json:
             image_data = request.json['image_data']
-            emotion_result, error = face_detector.detect_emotion_from_base64(image_data)
+            emotion_result, error = get_face_detector().detect_emotion_from_base64(image_data)
         
         else:
-            return jsonify({'error': 'No image data provided'}), 400
+            return ojsonify({'error': 'No image data provided'}, 400)
         
         if error:
-            return jsonify({'error': error}), 400
+            return ojsonify({'error': error}, 400)
         
         # Get recommendations
         recommendations = recommender.recommend_by_face_emotion(emotion_result, 15)
@@ -127,10 +187,10 @@ def analyze_image_emotion():
             'recommendations': recommendations
         }
         
-        return jsonify(response)
+        return ojsonify(response)
         
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
 
 @app.route('/api/search-tracks')
 def search_tracks():
@@ -140,7 +200,7 @@ def search_tracks():
         limit = int(request.args.get('limit', 10))
         
         if not query:
-            return jsonify({'error': 'No search query provided'}), 400
+            return ojsonify({'error': 'No search query provided'}, 400)
         
         tracks = spotify_client.search_tracks(query, limit=limit)
         
@@ -157,34 +217,37 @@ def search_tracks():
                 'image': track['album']['images'][0]['url'] if track['album']['images'] else None
             })
         
-        return jsonify({'tracks': formatted_tracks})
+        return ojsonify({'tracks': formatted_tracks})
         
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
 
 @app.route('/api/similar-tracks/<track_id>')
+@requires_recommender
 def get_similar_tracks(track_id):
     """API endpoint for getting similar tracks"""
     try:
         num_recommendations = int(request.args.get('limit', 10))
         similar_tracks = recommender.get_similar_tracks(track_id, num_recommendations)
         
-        return jsonify({'tracks': similar_tracks})
+        return ojsonify({'tracks': similar_tracks})
         
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
 
 @app.route('/api/emotion-stats')
+@requires_recommender
 def get_emotion_stats():
     """API endpoint for emotion distribution statistics"""
     try:
         stats = recommender.analyze_emotion_distribution()
-        return jsonify(stats)
+        return ojsonify(stats)
         
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
 
 @app.route('/api/recommend-by-features', methods=['POST'])
+@requires_recommender
 def recommend_by_features():
     """API endpoint for custom feature-based recommendations"""
     try:
@@ -194,14 +257,14 @@ def recommend_by_features():
         
         recommendations = recommender.recommend_by_emotion(features, num_recommendations)
         
-        return jsonify({'recommendations': recommendations})
+        return ojsonify({'recommendations': recommendations})
         
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
 
 @app.errorhandler(413)
 def too_large(e):
-    return jsonify({'error': 'File too large'}), 413
+    return ojsonify({'error': 'File too large'}, 413)
 
 @app.errorhandler(404)
 def not_found(e):
@@ -209,11 +272,11 @@ def not_found(e):
 
 @app.errorhandler(500)
 def server_error(e):
-    return jsonify({'error': 'Internal server error'}), 500
+    return ojsonify({'error': 'Internal server error'}, 500)
 
 if __name__ == '__main__':
     # Check if components are initialized
-    if not all([spotify_client, face_detector, text_detector, recommender]):
+    if not all([spotify_client, text_detector, recommender]):
         print("Warning: Some components failed to initialize. Please check your configuration.")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file